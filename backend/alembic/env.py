@@ -4,21 +4,20 @@ from sqlalchemy import pool
 from alembic import context
 import sys
 import os
-from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Load environment variables
-load_dotenv()
-
+# Importing the settings loads the environment from .env
 from app.core.config import settings
 from app.db.base import Base
 
 config = context.config
 
-if config.config_file_name is not None:
+# Callers running migrations inside the application opt out of this, since
+# fileConfig would replace the application's logging configuration
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 target_metadata = Base.metadata
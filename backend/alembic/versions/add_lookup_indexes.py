@@ -0,0 +1,45 @@
+"""add lookup indexes to patients and medical_analyses
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns), matching the indexes declared in database.py
+INDEXES = [
+    ('ix_analyses_patient_date', 'medical_analyses', ['patient_id', 'analysis_date']),
+    ('ix_medical_analyses_user_id', 'medical_analyses', ['user_id']),
+    ('ix_medical_analyses_analysis_date', 'medical_analyses', ['analysis_date']),
+    ('ix_medical_analyses_status', 'medical_analyses', ['status']),
+    ('ix_patients_primary_doctor_id', 'patients', ['primary_doctor_id']),
+    ('ix_patients_last_name', 'patients', ['last_name']),
+]
+
+def upgrade():
+    # These tables are created by database.init_db rather than by a revision,
+    # so only index the ones that exist; create_all adds the indexes otherwise
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    
+    # CONCURRENTLY can't run inside a transaction, but it doesn't lock the
+    # tables against writes while the index builds
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if table in existing_tables:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                    f'ON {table} ({", ".join(columns)})'
+                )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -0,0 +1,41 @@
+"""rename the users.role enum type to user_role
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+def _enum_types(bind):
+    return set(bind.execute(sa.text(
+        "SELECT typname FROM pg_type WHERE typname IN ('userrole', 'user_role')"
+    )).scalars())
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    # Only a native enum that create_all made under SQLAlchemy's default name
+    # is renamed, a catalog-only change. A plain string role column (the
+    # users table from revision 001) is left alone: the app models still
+    # write lower-case role strings there.
+    types = _enum_types(bind)
+    if 'userrole' in types and 'user_role' not in types:
+        op.execute('ALTER TYPE userrole RENAME TO user_role')
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    if 'user_role' in _enum_types(bind):
+        op.execute('ALTER TYPE user_role RENAME TO userrole')
@@ -51,8 +51,9 @@ async def upload_dicom_file(
             shutil.copyfileobj(file.file, temp_file)
             temp_path = temp_file.name
         
-        # Validate that this is a DICOM file
-        if not await validate_dicom_file(temp_path):
+        # Validate that this is a DICOM file, keeping the parsed header for reuse
+        dicom_header = await validate_dicom_file(temp_path)
+        if dicom_header is None:
             os.unlink(temp_path)  # Remove temp file
             raise HTTPException(status_code=400, detail="Invalid DICOM file")
         
@@ -87,7 +88,7 @@ async def upload_dicom_file(
             }
         else:
             # Process immediately for small files
-            metadata = await extract_dicom_metadata(temp_path)
+            metadata = await extract_dicom_metadata(dicom_header)
             
             # Store the file in a permanent location (would use proper storage in production)
             storage_path = f"./storage/dicom/{file_id}.dcm"
@@ -8,9 +8,9 @@ from sqlalchemy.orm import Session
 from . import models, schemas
 from .database import get_db
 import os
-from dotenv import load_dotenv
+from .core.config import load_environment
 
-load_dotenv()
+load_environment()
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
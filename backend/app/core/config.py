@@ -1,10 +1,17 @@
 from pydantic import BaseSettings
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
-# Load environment variables
-load_dotenv()
+@lru_cache(maxsize=1)
+def load_environment() -> None:
+    """Load .env into os.environ; the file is only read once per process"""
+    load_dotenv()
+
+# Load environment variables. Modules that still read os.getenv directly call
+# load_environment() rather than load_dotenv() themselves.
+load_environment()
 
 # Database configuration
 DB_USER = os.getenv("DB_USER", "postgres")
@@ -40,6 +47,8 @@ class Settings(BaseSettings):
     
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "dev" runs a single auto-reloading worker, anything else 2 * cores + 1 workers
+    ENV: str = os.getenv("ENV", "dev")
     
     # Model settings
     MODEL_PATH: str = os.getenv("MODEL_PATH", "backend/models")
@@ -54,7 +63,15 @@ class Settings(BaseSettings):
     HF_MRI_MODEL: str = os.getenv("HF_MRI_MODEL", "microsoft/resnet-50")
     HF_CT_MODEL: str = os.getenv("HF_CT_MODEL", "microsoft/resnet-50")
     
+    # "sync" runs migrations before the server starts, "async" in the background on startup
+    MIGRATION_MODE: str = os.getenv("MIGRATION_MODE", "sync")
+    
     class Config:
         case_sensitive = True
 
-settings = Settings() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built once on first use."""
+    return Settings()
+
+settings = get_settings()
@@ -2,13 +2,13 @@ import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 import logging
 from typing import Generator
+from .config import load_environment
 
 # Load environment variables
 try:
-    load_dotenv()
+    load_environment()
 except Exception as e:
     logging.warning(f"Failed to load .env file: {e}")
 
@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from transformers import AutoModelForImageClassification, AutoFeatureExtractor
 from ..core.config import settings
 import logging
@@ -44,6 +45,18 @@ class ModelLoader:
     def get_ct_model(cls):
         return cls.load_model(settings.CT_MODEL)
     
+    @classmethod
+    def preload_models(cls):
+        """Load the X-ray, MRI and CT models up front"""
+        # The three settings usually name the same checkpoint, so load each
+        # distinct one once; different checkpoints load in parallel, since
+        # reading the weights off disk releases the GIL
+        model_types = list(dict.fromkeys(
+            (settings.XRAY_MODEL, settings.MRI_MODEL, settings.CT_MODEL)
+        ))
+        with ThreadPoolExecutor(max_workers=len(model_types)) as executor:
+            list(executor.map(cls.load_model, model_types))
+    
     @classmethod
     def clear_cache(cls):
         """Clear the model cache"""
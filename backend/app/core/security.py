@@ -10,16 +10,15 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
-from dotenv import load_dotenv
 import pyotp
 import base64
 from ..models.user import User
-from ..core.config import settings
+from ..core.config import settings, load_environment
 from sqlalchemy.orm import Session
 from ..db.session import get_db
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Security settings
 SECRET_KEY = os.getenv("SECRET_KEY", "insecure_key_for_dev")
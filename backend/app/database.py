@@ -2,9 +2,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
-from dotenv import load_dotenv
+from .core.config import load_environment
 
-load_dotenv()
+load_environment()
 
 SQLALCHEMY_DATABASE_URL = os.getenv(
     "DATABASE_URL",
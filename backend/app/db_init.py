@@ -77,9 +77,8 @@ def init_db(db: Session) -> None:
                 is_active=True
             )
             db.add(admin)
-            db.commit()
-            db.refresh(admin)
-            logger.info("Created admin user")
+            # Flush for the id; the user and its settings commit together
+            db.flush()
 
             # Create default settings for admin
             admin_settings = UserSettings(
@@ -103,7 +102,7 @@ def init_db(db: Session) -> None:
             )
             db.add(admin_settings)
             db.commit()
-            logger.info("Created admin settings")
+            logger.info("Created admin user and settings")
 
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
@@ -14,14 +14,11 @@ from app.models.user import User
 from pydantic import BaseModel, EmailStr, Field, validator
 import re
 import auth
+from database import warm_up_pool
 from app.core.database import engine, get_db
 import json
 import time
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
+from app.core.config import get_settings
 from app.core.middleware import setup_middlewares
 from app.db_init import init as init_database
 from app.utils.audit_logger import initialize as init_audit_logger, shutdown as shutdown_audit_logger
@@ -159,6 +156,28 @@ async def startup_event():
     else:
         logger.warning("Database initialization issues encountered")
     
+    # Open the auth database pool before serving requests, so the first burst
+    # of logins doesn't race to establish connections
+    try:
+        await asyncio.to_thread(warm_up_pool)
+    except Exception as e:
+        logger.warning(f"Could not pre-open database connections: {e}")
+    
+    # Load the image models before the first analysis request; checkpoints
+    # shared between modalities are loaded once
+    if not get_settings().USE_MOCK_MODELS:
+        try:
+            from app.core.model_loader import ModelLoader
+            await asyncio.to_thread(ModelLoader.preload_models)
+        except Exception as e:
+            logger.warning(f"Could not preload models: {e}")
+    
+    # Upgrade the schema in the background when configured to, so long
+    # migrations don't hold up serving requests
+    if get_settings().MIGRATION_MODE == "async":
+        from run_migrations import run_migrations_async
+        app.state.migrations_task = asyncio.create_task(run_migrations_async())
+    
     # Initialize audit logger
     await init_audit_logger()
     logger.info("Audit logger initialized successfully")
@@ -231,7 +250,7 @@ async def login_for_access_token(
     db: Session = Depends(get_db)
 ):
     user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+    if not user or not await auth.averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -37,6 +37,11 @@ class AdvancedPatternMatcher:
             ngram_range=(1, 2)
         )
         self._initialize_vectorizer()
+        # The databases are fixed after loading, so vectorize their conditions once
+        self.condition_vectors = {
+            'primary': self._prepare_condition_vectors(self.conditions_db),
+            'secondary': self._prepare_condition_vectors(self.condition_database)
+        }
         self.condition_rarity = self._calculate_condition_rarity()
         
     def _load_conditions_db(self, filename: str) -> Dict:
@@ -153,7 +158,9 @@ class AdvancedPatternMatcher:
                               patient_data: Dict,
                               source: str) -> List[Dict]:
         """Match patterns against a specific database."""
-        condition_vectors = self._prepare_condition_vectors(database)
+        condition_vectors = self.condition_vectors.get(source)
+        if condition_vectors is None:
+            condition_vectors = self._prepare_condition_vectors(database)
         
         # Calculate similarities using multiple methods
         cosine_scores = self._calculate_cosine_similarity(feature_vector, condition_vectors)
@@ -317,9 +324,9 @@ class AdvancedPatternMatcher:
                                     conditions_db: Dict) -> np.ndarray:
         """Calculate similarity based on clinical pattern matching."""
         pattern_scores = []
+        feature_patterns = set(features.get('key_findings', []))
         for condition in conditions_db['conditions']:
             # Calculate pattern overlap
-            feature_patterns = set(features.get('key_findings', []))
             condition_patterns = set(condition['clinical_patterns'])
             overlap = len(feature_patterns.intersection(condition_patterns))
             total = len(feature_patterns.union(condition_patterns))
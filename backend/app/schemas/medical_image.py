@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 from ..models.medical_image import ImageType
@@ -41,7 +41,7 @@ class MedicalImage(MedicalImageBase):
     height: int
     user_id: int
     upload_date: datetime
-    analysis_results: List[AnalysisResult] = []
+    analysis_results: List[AnalysisResult] = Field(default_factory=list)
 
     class Config:
         orm_mode = True 
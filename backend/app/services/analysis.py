@@ -1,6 +1,11 @@
 # Hello World
 import os
+import copy
 import time
+import asyncio
+import hashlib
+import functools
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Union
 import torch
 from PIL import Image
@@ -12,7 +17,6 @@ from ..core.config import settings
 import json
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
-import traceback
 
 from ..models.user import User
 from ..models.analysis import Analysis
@@ -22,6 +26,49 @@ from ..ml.analysis.pattern_matcher import PatternMatcher
 
 logger = logging.getLogger(__name__)
 
+# In-process LRU cache of image analysis results keyed by (file digest, model version)
+ANALYSIS_CACHE_SIZE = 256
+_analysis_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+def _file_digest(file_path: str) -> str:
+    """Return a BLAKE2b digest of the file contents"""
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_get(key: tuple) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached analysis result and mark it as recently used"""
+    result = _analysis_cache.get(key)
+    if result is not None:
+        _analysis_cache.move_to_end(key)
+        # Callers may annotate the result; keep those changes out of the cache
+        result = copy.deepcopy(result)
+    return result
+
+def _cache_put(key: tuple, result: Dict[str, Any]) -> None:
+    """Store a copy of an analysis result, evicting the least recently used entry when full"""
+    _analysis_cache[key] = copy.deepcopy(result)
+    _analysis_cache.move_to_end(key)
+    if len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+        _analysis_cache.popitem(last=False)
+
+@functools.lru_cache(maxsize=4096)
+def _recommendations_for(key: tuple) -> tuple:
+    """Build recommendations for a canonical findings signature"""
+    recommendations = ["Consult with a medical professional for detailed interpretation"]
+    
+    for urgency, location in key:
+        if urgency == 2:
+            recommendations.append("Consider immediate follow-up with specialist")
+        elif urgency == 1:
+            recommendations.append("Schedule follow-up appointment")
+        if location:
+            recommendations.append(f"Monitor {location} for changes")
+    
+    return tuple(recommendations)
+
 class AnalysisService:
     """Service class for handling medical analysis operations"""
     
@@ -31,6 +78,8 @@ class AnalysisService:
         self.case_processor = MedicalCaseProcessor()
         self.pattern_matcher = PatternMatcher()
         self.models = {}
+        # Checkpoint actually loaded per model type (may be the resnet-50 fallback)
+        self.model_refs = {}
         self.online_mode = not settings.USE_MOCK_MODELS  # Use setting from config
         self.load_models()
         logger.info("Analysis service initialized")
@@ -43,21 +92,31 @@ class AnalysisService:
                 try:
                     # Set up device
                     device = 0 if torch.cuda.is_available() else -1
+                    if device >= 0:
+                        # All image models take a fixed 224x224 input
+                        torch.backends.cudnn.benchmark = True
                     
-                    # Use public models by default
                     model_ids = {
-                        "xray": "microsoft/resnet-50",
-                        "mri": "microsoft/resnet-50",
-                        "ct": "microsoft/resnet-50"
+                        "xray": settings.HF_XRAY_MODEL,
+                        "mri": settings.HF_MRI_MODEL,
+                        "ct": settings.HF_CT_MODEL
                     }
                     
                     for model_type, model_id in model_ids.items():
                         try:
+                            # Configured models may be gated, so only use them with a token
+                            kwargs = {"device": device}
+                            if settings.HF_TOKEN:
+                                kwargs["use_auth_token"] = settings.HF_TOKEN
+                                model_ref = model_id
+                            else:
+                                model_ref = "microsoft/resnet-50"
                             self.models[model_type] = pipeline(
                                 "image-classification",
-                                model=model_id,
-                                device=device
+                                model=model_ref,
+                                **kwargs
                             )
+                            self.model_refs[model_type] = model_ref
                             logger.info(f"Loaded {model_type} model successfully")
                         except Exception as e:
                             logger.error(f"Error loading {model_type} model: {str(e)}")
@@ -129,8 +188,7 @@ class AnalysisService:
             return complete_results
             
         except Exception as e:
-            logger.error(f"Error in text analysis: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Error in text analysis")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Analysis processing error: {str(e)}"
@@ -160,15 +218,21 @@ class AnalysisService:
                     detail=f"Image file not found: {image_path}"
                 )
             
-            # Select appropriate analysis method based on image type
-            if image_type == "xray":
-                results = self.advanced_analyzer.analyze_xray(image_path)
-            elif image_type == "mri":
-                results = self.advanced_analyzer.analyze_mri(image_path)
-            elif image_type == "ct":
-                results = self.advanced_analyzer.analyze_ct_scan(image_path)
-            else:
-                results = self.advanced_analyzer.analyze_medical_image(image_path)
+            # Reuse the result if this exact file was already analyzed
+            cache_key = (_file_digest(image_path), image_type)
+            results = _cache_get(cache_key)
+            
+            if results is None:
+                # Select appropriate analysis method based on image type
+                if image_type == "xray":
+                    results = self.advanced_analyzer.analyze_xray(image_path)
+                elif image_type == "mri":
+                    results = self.advanced_analyzer.analyze_mri(image_path)
+                elif image_type == "ct":
+                    results = self.advanced_analyzer.analyze_ct_scan(image_path)
+                else:
+                    results = self.advanced_analyzer.analyze_medical_image(image_path)
+                _cache_put(cache_key, results)
             
             # Process any additional context if provided
             context_results = {}
@@ -188,13 +252,96 @@ class AnalysisService:
         except HTTPException as he:
             raise he
         except Exception as e:
-            logger.error(f"Error in image analysis: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.exception("Error in image analysis")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Image processing error: {str(e)}"
             )
     
+    async def analyze_image(self, file_path: str, model_id: Optional[str] = None) -> Dict:
+        """Analyze a medical image"""
+        try:
+            start_time = time.time()
+            
+            # Check if we're using real models or mock responses
+            if self.online_mode and "xray" in self.models:
+                # Keyed on the checkpoint that produces the predictions
+                cache_key = (_file_digest(file_path), self.model_refs["xray"])
+                cached = _cache_get(cache_key)
+                if cached is not None:
+                    return cached
+                
+                # Load and preprocess image
+                image = Image.open(file_path)
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                
+                # Get predictions (in a worker thread so concurrent analyses can overlap)
+                predictions = await asyncio.to_thread(self._predict, "xray", image)
+                
+                # Process results
+                findings = self._predictions_to_findings(predictions)
+            else:
+                cache_key = None
+                # Generate mock predictions
+                findings = self._generate_mock_image_findings()
+            
+            # Generate recommendations
+            recommendations = self._generate_recommendations(findings)
+            
+            processing_time = time.time() - start_time
+            
+            result = {
+                "findings": findings,
+                "recommendations": recommendations,
+                "confidence_scores": {f["description"]: f["confidence"] for f in findings},
+                "processing_time": processing_time
+            }
+            if cache_key is not None:
+                _cache_put(cache_key, result)
+            
+            return result
+            
+        except Exception:
+            logger.exception("Error analyzing image")
+            raise
+
+    async def analyze_report(self, file_path: str) -> Dict:
+        """Analyze a medical report"""
+        try:
+            start_time = time.time()
+            
+            # Check if we're using real models or mock responses
+            if self.online_mode and "report" in self.models:
+                # Read report text
+                with open(file_path, "r", encoding="utf-8") as f:
+                    text = f.read()
+                
+                # Get predictions (in a worker thread so concurrent analyses can overlap)
+                predictions = await asyncio.to_thread(self._predict, "report", text)
+                
+                # Process results
+                findings = self._predictions_to_findings(predictions)
+            else:
+                # Generate mock predictions
+                findings = self._generate_mock_report_findings()
+            
+            # Generate recommendations
+            recommendations = self._generate_recommendations(findings)
+            
+            processing_time = time.time() - start_time
+            
+            return {
+                "findings": findings,
+                "recommendations": recommendations,
+                "confidence_scores": {f["description"]: f["confidence"] for f in findings},
+                "processing_time": processing_time
+            }
+            
+        except Exception:
+            logger.exception("Error analyzing report")
+            raise
+
     async def save_analysis(self, 
                            user_id: int, 
                            analysis_data: Dict[str, Any],
@@ -343,5 +490,107 @@ class AnalysisService:
                 detail=f"Failed to delete analysis: {str(e)}"
             )
 
+    def _predict(self, model_type: str, inputs: Any) -> List[Dict]:
+        """Run a loaded pipeline without autograd tracking"""
+        # inference_mode is thread-local, so it is entered on the thread running the model
+        with torch.inference_mode():
+            return self.models[model_type](inputs)
+
+    def _predictions_to_findings(self, predictions: List[Dict]) -> List[Dict]:
+        """Convert pipeline predictions into findings"""
+        describe = "Detected %s with confidence %.2f".__mod__
+        normal_label = "normal"
+        findings = []
+        append = findings.append
+        for pred in predictions:
+            label = pred["label"]
+            score = float(pred["score"])
+            append({
+                "type": "abnormality" if label != normal_label else "normal",
+                "description": describe((label, score)),
+                "confidence": score,
+                "location": None  # Add location if available
+            })
+        return findings
+
+    def _generate_mock_image_findings(self) -> List[Dict]:
+        """Generate mock findings for image analysis"""
+        possible_findings = [
+            {
+                "type": "normal",
+                "description": "No abnormalities detected",
+                "confidence": round(random.uniform(0.7, 0.98), 2),
+                "location": None
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected possible pulmonary infiltrate",
+                "confidence": round(random.uniform(0.6, 0.85), 2),
+                "location": "Right lower lobe"
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected cardiomegaly",
+                "confidence": round(random.uniform(0.5, 0.75), 2),
+                "location": "Cardiac silhouette"
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected possible nodule",
+                "confidence": round(random.uniform(0.4, 0.7), 2),
+                "location": "Left upper lobe"
+            }
+        ]
+        
+        # Randomly select 1-3 findings
+        num_findings = random.randint(1, 3)
+        return random.sample(possible_findings, num_findings)
+    
+    def _generate_mock_report_findings(self) -> List[Dict]:
+        """Generate mock findings for report analysis"""
+        possible_findings = [
+            {
+                "type": "normal",
+                "description": "Report indicates normal findings",
+                "confidence": round(random.uniform(0.7, 0.95), 2),
+                "location": None
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected mention of abnormal white blood cell count",
+                "confidence": round(random.uniform(0.6, 0.9), 2),
+                "location": "Blood work"
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected mention of elevated blood pressure",
+                "confidence": round(random.uniform(0.7, 0.85), 2),
+                "location": "Vital signs"
+            },
+            {
+                "type": "abnormality",
+                "description": "Detected mention of irregular heartbeat",
+                "confidence": round(random.uniform(0.5, 0.8), 2),
+                "location": "Cardiac assessment"
+            }
+        ]
+        
+        # Randomly select 1-2 findings
+        num_findings = random.randint(1, 2)
+        return random.sample(possible_findings, num_findings)
+
+    def _generate_recommendations(self, findings: List[Dict]) -> List[str]:
+        """Generate recommendations based on findings"""
+        # Only abnormalities contribute, bucketed by confidence and keyed by location
+        key = tuple(
+            (
+                2 if finding["confidence"] > 0.8 else 1 if finding["confidence"] > 0.5 else 0,
+                finding["location"]
+            )
+            for finding in findings
+            if finding["type"] == "abnormality"
+        )
+        return list(_recommendations_for(key))
+
 # Create singleton instance
 analysis_service = AnalysisService() 
\ No newline at end of file
@@ -9,6 +9,8 @@ class MedicalAnalysisService:
         self.logger = logging.getLogger(__name__)
         self.analyzer = AdvancedMedicalAnalyzer()
         self.pattern_matcher = AdvancedPatternMatcher()
+        # The matcher already parses conditions.json at startup; pin that dict
+        self._conditions_db = self.pattern_matcher.conditions_db
         
     async def analyze_medical_case(self,
                                  patient_data: Dict,
@@ -36,7 +38,6 @@ class MedicalAnalysisService:
             # Perform pattern matching
             pattern_matches = self.pattern_matcher.match_patterns(
                 features=self._extract_features(analysis_result),
-                conditions_db=self._load_conditions_db(),
                 patient_data=patient_data
             )
             
@@ -105,9 +106,8 @@ class MedicalAnalysisService:
         }
     
     def _load_conditions_db(self) -> Dict:
-        """Load conditions database."""
-        # Implement loading from conditions.json
-        return {}
+        """Return the conditions database loaded at startup."""
+        return self._conditions_db
     
     def _generate_report(self, 
                         analysis_result: AnalysisResult,
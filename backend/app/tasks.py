@@ -3,10 +3,15 @@ from typing import Dict
 from sqlalchemy.orm import Session
 from . import models
 from .services.analysis import analysis_service
+from .database import SessionLocal
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Uploads claimed per polling run, and how many of them are analyzed at once
+UPLOAD_BATCH_SIZE = 100
+MAX_CONCURRENT_UPLOADS = 4
+
 async def process_upload(upload_id: int, db: Session):
     """Process an upload asynchronously"""
     try:
@@ -16,10 +21,6 @@ async def process_upload(upload_id: int, db: Session):
             logger.error(f"Upload {upload_id} not found")
             return
         
-        # Update status to processing
-        upload.status = "processing"
-        db.commit()
-        
         # Process based on file type
         if upload.file_type in ["xray", "mri", "ct"]:
             analysis_result = await analysis_service.analyze_image(
@@ -41,7 +42,7 @@ async def process_upload(upload_id: int, db: Session):
         )
         db.add(analysis)
         
-        # Update upload status
+        # Store the analysis and the status change in one transaction
         upload.status = "completed"
         db.commit()
         
@@ -49,21 +50,49 @@ async def process_upload(upload_id: int, db: Session):
         
     except Exception as e:
         logger.error(f"Error processing upload {upload_id}: {str(e)}")
-        # Update upload status to failed
-        upload.status = "failed"
+        # Discard any partial work, then record the failure
+        db.rollback()
+        db.query(models.Upload).filter(models.Upload.id == upload_id).update(
+            {models.Upload.status: "failed"}, synchronize_session=False
+        )
         db.commit()
         raise
 
 async def process_pending_uploads(db: Session):
-    """Process all pending uploads"""
+    """Process pending uploads concurrently"""
     try:
-        pending_uploads = db.query(models.Upload).filter(
+        # Claim a batch; SKIP LOCKED lets several workers poll without picking the same rows.
+        # Only the ids are needed here, and the claim is one UPDATE for the whole batch.
+        upload_ids = [row.id for row in db.query(models.Upload.id).filter(
             models.Upload.status == "pending"
-        ).all()
+        ).with_for_update(skip_locked=True).limit(UPLOAD_BATCH_SIZE)]
+        
+        if upload_ids:
+            db.query(models.Upload).filter(models.Upload.id.in_(upload_ids)).update(
+                {models.Upload.status: "processing"}, synchronize_session=False
+            )
+        db.commit()
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+        
+        async def process_claimed(upload_id: int):
+            # Sessions are not safe to share between concurrent tasks
+            async with semaphore:
+                task_db = SessionLocal()
+                try:
+                    await process_upload(upload_id, task_db)
+                finally:
+                    task_db.close()
+        
+        results = await asyncio.gather(
+            *(process_claimed(upload_id) for upload_id in upload_ids),
+            return_exceptions=True
+        )
         
-        for upload in pending_uploads:
-            await process_upload(upload.id, db)
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        if failed:
+            logger.error(f"{failed} of {len(upload_ids)} pending uploads failed to process")
             
     except Exception as e:
         logger.error(f"Error processing pending uploads: {str(e)}")
-        raise 
\ No newline at end of file
+        raise 
@@ -2,11 +2,25 @@ import logging
 import json
 import datetime
 import os
+import re
+import time
 import uuid
+import collections
+import functools
+import struct
+import zlib
+from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 import asyncio
 from contextlib import asynccontextmanager
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -69,6 +83,41 @@ class LOG_ACTION(str, Enum):
     BACKUP_CREATED = "backup_created"
     ERROR = "error"
 
+@dataclass
+class LogEntry:
+    """A buffered audit event (slotted to avoid a per-instance __dict__)"""
+    __slots__ = ("id", "timestamp", "category", "action", "user_id", "ip_address", "details")
+    
+    id: str
+    timestamp: str
+    category: str
+    action: str
+    user_id: str
+    ip_address: str
+    details: Dict[str, Any]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "category": self.category,
+            "action": self.action,
+            "user_id": self.user_id,
+            "ip_address": self.ip_address,
+            "details": self.details
+        }
+
+# Enum values compared in hot paths
+_CAT_SECURITY = LOG_CATEGORY.SECURITY.value
+_CAT_DATA_ACCESS = LOG_CATEGORY.DATA_ACCESS.value
+_CAT_CONSENT = LOG_CATEGORY.CONSENT.value
+_ACT_ANONYMIZE = LOG_ACTION.ANONYMIZE.value
+
+# Members and their plain string values normalize to the value in one lookup
+# (str enums hash equal to their values); unknown strings pass through
+_CAT_TO_STR = {member: member.value for member in LOG_CATEGORY}
+_ACT_TO_STR = {member: member.value for member in LOG_ACTION}
+
 # Sensitive data patterns for sanitization
 SENSITIVE_PATTERNS = [
     # Patient identifiers
@@ -88,19 +137,87 @@ SENSITIVE_PATTERNS = [
     (r'\b\d{5}(-\d{4})?\b', '[ZIP]')  # ZIP codes
 ]
 
+# Compiled once at import so sanitization doesn't go through re's pattern cache per value
+_COMPILED_PATTERNS = [(re.compile(pattern), replacement) for pattern, replacement in SENSITIVE_PATTERNS]
+# All value patterns fused into one alternation so clean strings are rejected in a single scan
+_FUSED_PATTERN = re.compile('|'.join(f'(?:{pattern})' for pattern, _ in SENSITIVE_PATTERNS))
+_SENSITIVE_KEY_TERMS = (
+    'password', 'token', 'secret', 'key', 'ssn', 'credit', 'card', 'address',
+    'email', 'phone', 'birth', 'name', 'gender', 'race', 'ethnicity', 'diagnosis'
+)
+_SENSITIVE_KEYS = frozenset(_SENSITIVE_KEY_TERMS)
+_KEY_RE = re.compile('|'.join(_SENSITIVE_KEY_TERMS))
+
+@functools.lru_cache(maxsize=1024)
+def _is_sensitive_key(key: str) -> bool:
+    """Check whether a dict key names sensitive data (exact term or compound like user_password)"""
+    lowered = key.lower()
+    return lowered in _SENSITIVE_KEYS or _KEY_RE.search(lowered) is not None
+
 # Configure log directory
 LOG_DIR = os.environ.get("AUDIT_LOG_DIR", "./logs/audit")
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Initialize buffer for batch processing
-log_buffer = []
-buffer_lock = asyncio.Lock()
+# Initialize buffer for batch processing. Appends and the swap in flush_logs
+# never await, so the event loop serializes them without a lock.
 MAX_BUFFER_SIZE = 50
+FLUSH_INTERVAL_SECONDS = 30
+# Bound on pending events while writes keep failing; the oldest are dropped beyond it
+MAX_PENDING_EVENTS = MAX_BUFFER_SIZE * 4
+log_buffer = collections.deque(maxlen=MAX_PENDING_EVENTS)
+dropped_events_total = 0
+
+# Set when the buffer fills to wake the writer task started by initialize()
+_flush_event: Optional[asyncio.Event] = None
 
 # Log rotation settings
 MAX_LOG_SIZE_MB = 10
 MAX_LOG_FILES = 30
 
+# Each log file has a sidecar index (audit-YYYY-MM-DD.idx) with one fixed-width
+# record per line: byte offset, line length, timestamp (microseconds since the
+# epoch) and CRC32 hashes of category, action and user ID. Queries filter the
+# index and only read and parse the matching lines.
+_INDEX_RECORD = struct.Struct('<QIqIII')
+_INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('length', '<u4'),
+    ('timestamp', '<i8'),
+    ('category', '<u4'),
+    ('action', '<u4'),
+    ('user', '<u4')
+])
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+# Event IDs are drawn from a pool filled by one os.urandom call; the pool is
+# tied to the process that filled it so forked workers never share IDs
+_UUID_POOL_SIZE = 256
+_uuid_pool: List[str] = []
+_uuid_pool_pid: Optional[int] = None
+
+# Last formatted timestamp, reused for events within the same microsecond
+_timestamp_cache: Tuple[int, str] = (0, "")
+
+def _new_event_id() -> str:
+    """Get a random (version 4) UUID string for a log entry"""
+    global _uuid_pool_pid
+    
+    if not _uuid_pool or _uuid_pool_pid != os.getpid():
+        raw = os.urandom(16 * _UUID_POOL_SIZE)
+        _uuid_pool[:] = [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, len(raw), 16)]
+        _uuid_pool_pid = os.getpid()
+    return _uuid_pool.pop()
+
+def _utc_timestamp() -> str:
+    """Get the current UTC time in ISO 8601 format with a Z suffix"""
+    global _timestamp_cache
+    
+    micros = time.time_ns() // 1000
+    if micros != _timestamp_cache[0]:
+        _timestamp_cache = (micros, (_EPOCH + micros * _MICROSECOND).isoformat() + "Z")
+    return _timestamp_cache[1]
+
 async def log_event(
     category: Union[LOG_CATEGORY, str],
     action: Union[LOG_ACTION, str], 
@@ -122,22 +239,26 @@ async def log_event(
     """
     try:
         # Create log entry
-        log_entry = {
-            "id": str(uuid.uuid4()),
-            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
-            "category": category if isinstance(category, str) else category.value,
-            "action": action if isinstance(action, str) else action.value,
-            "user_id": user_id or "system",
-            "ip_address": ip_address or "127.0.0.1",
-            "details": sanitize_data(details) if sensitive and details else details or {}
-        }
+        log_entry = LogEntry(
+            id=_new_event_id(),
+            timestamp=_utc_timestamp(),
+            category=_CAT_TO_STR.get(category, category),
+            action=_ACT_TO_STR.get(action, action),
+            user_id=user_id or "system",
+            ip_address=ip_address or "127.0.0.1",
+            details=sanitize_data(details) if sensitive and details else details or {}
+        )
         
         # Add to buffer
-        async with buffer_lock:
-            log_buffer.append(log_entry)
-            
-            # Flush buffer if it's full
-            if len(log_buffer) >= MAX_BUFFER_SIZE:
+        if len(log_buffer) == MAX_PENDING_EVENTS:
+            _record_dropped(1)
+        log_buffer.append(log_entry)
+        
+        # Flush buffer if it's full
+        if len(log_buffer) >= MAX_BUFFER_SIZE:
+            if _flush_event is not None:
+                _flush_event.set()
+            else:
                 await flush_logs()
     
     except Exception as e:
@@ -147,64 +268,186 @@ async def flush_logs() -> None:
     """Flush logs from buffer to storage"""
     global log_buffer
     
-    async with buffer_lock:
-        if not log_buffer:
-            return
-        
-        # Get a copy of the buffer and clear it
-        logs_to_write = log_buffer.copy()
-        log_buffer = []
+    if not log_buffer:
+        return
+    
+    # Take the pending entries and start a new buffer
+    logs_to_write, log_buffer = log_buffer, collections.deque(maxlen=MAX_PENDING_EVENTS)
     
     try:
         # Get current log file
         log_file = get_current_log_file()
         
-        # Write logs to file
-        with open(log_file, 'a') as f:
-            for log_entry in logs_to_write:
-                f.write(json.dumps(log_entry) + '\n')
-        
-        # Check if rotation is needed
-        await check_log_rotation(log_file)
+        # Write logs and their index records, then rotate if needed, in a
+        # single hop to a worker thread
+        lines = [_serialize_entry(log_entry) for log_entry in logs_to_write]
+        await asyncio.to_thread(_write_and_rotate, log_file, logs_to_write, lines)
     
     except Exception as e:
         logger.error(f"Error flushing audit logs: {str(e)}")
         
-        # Put logs back in the buffer
-        async with buffer_lock:
-            log_buffer = logs_to_write + log_buffer
+        # Put logs back in front of anything buffered meanwhile; the bounded
+        # deque drops the oldest if the total overflows
+        overflow = len(logs_to_write) + len(log_buffer) - MAX_PENDING_EVENTS
+        if overflow > 0:
+            _record_dropped(overflow)
+        logs_to_write.extend(log_buffer)
+        log_buffer = logs_to_write
+
+def _record_dropped(count: int) -> None:
+    """Count audit events discarded because the pending buffer was full"""
+    global dropped_events_total
+    dropped_events_total += count
+    logger.warning(
+        f"Audit log buffer full, dropped {count} event(s) ({dropped_events_total} total)"
+    )
+
+def _json_default(value: Any) -> str:
+    """Fallback for values JSON can't represent: ISO format for dates, str() otherwise"""
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+def _serialize_entry(log_entry: LogEntry) -> bytes:
+    """
+    Serialize a log entry to a single JSON line
+    
+    Values JSON can't represent (UUIDs, sets, ...) are written as str(), and
+    datetimes in ISO format as orjson does natively; an entry that still fails keeps its details as a repr() so one bad
+    event can't fail the whole flush.
+    """
+    try:
+        if ORJSON_AVAILABLE:
+            # orjson serializes dataclasses natively; int keys become strings as with json
+            return orjson.dumps(log_entry, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(log_entry.to_dict(), default=_json_default).encode('utf-8')
+    except Exception as e:
+        logger.error(f"Error serializing audit log entry {log_entry.id}: {str(e)}")
+        entry = log_entry.to_dict()
+        entry["details"] = repr(entry["details"])
+        return json.dumps(entry, default=_json_default).encode('utf-8')
+
+def _append_to_file(log_file: str, payload: bytes) -> int:
+    """Append a payload to the log file with a single open/write and return the end offset"""
+    fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+    try:
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        return os.lseek(fd, 0, os.SEEK_CUR)
+    finally:
+        os.close(fd)
+
+def _write_batch(log_file: str, entries: collections.deque, lines: List[bytes]) -> None:
+    """Append serialized entries to the log file and their records to its index"""
+    payload = b'\n'.join(lines) + b'\n'
+    offset = _append_to_file(log_file, payload) - len(payload)
+    
+    try:
+        records = bytearray()
+        for log_entry, line in zip(entries, lines):
+            length = len(line) + 1
+            records += _INDEX_RECORD.pack(
+                offset,
+                length,
+                _to_micros(datetime.datetime.fromisoformat(log_entry.timestamp.rstrip("Z"))),
+                _hash_field(log_entry.category),
+                _hash_field(log_entry.action),
+                _hash_field(log_entry.user_id)
+            )
+            offset += length
+        _append_to_file(_index_path(log_file), bytes(records))
+    except Exception as e:
+        # The log lines are already written; queries fall back to a full scan
+        # for this file because the index no longer covers it
+        logger.warning(f"Error indexing audit logs for {log_file}: {str(e)}")
+
+def _write_and_rotate(log_file: str, entries: collections.deque, lines: List[bytes]) -> None:
+    """Write a batch and check log rotation from the same worker thread"""
+    _write_batch(log_file, entries, lines)
+    
+    # The batch is on disk at this point, so rotation errors must not re-buffer it
+    try:
+        _rotate_log_file(log_file)
+    except Exception as e:
+        logger.error(f"Error rotating audit logs: {str(e)}")
+
+def _index_path(log_file: str) -> str:
+    """Get the index path for a log file (audit-D.log[.TS] -> audit-D.idx[.TS])"""
+    directory, name = os.path.split(log_file)
+    return os.path.join(directory, name.replace('.log', '.idx', 1))
+
+def _hash_field(value: Optional[str]) -> int:
+    """Hash an indexed field value"""
+    return zlib.crc32(value.encode('utf-8')) if value is not None else 0
+
+def _to_micros(timestamp: datetime.datetime) -> int:
+    """Convert a naive UTC datetime to microseconds since the epoch"""
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+_cached_log_day: Optional[int] = None
+_cached_log_path: Optional[str] = None
 
 def get_current_log_file() -> str:
-    """Get the current log file path"""
-    today = datetime.datetime.utcnow().strftime('%Y-%m-%d')
-    return os.path.join(LOG_DIR, f"audit-{today}.log")
+    """Get the current log file path (recomputed only when the UTC day changes)"""
+    global _cached_log_day, _cached_log_path
+    
+    today = int(time.time()) // 86400
+    if today != _cached_log_day:
+        date_str = (_EPOCH + datetime.timedelta(days=today)).date().isoformat()
+        _cached_log_path = os.path.join(LOG_DIR, f"audit-{date_str}.log")
+        _cached_log_day = today
+    return _cached_log_path
 
 async def check_log_rotation(log_file: str) -> None:
     """Check if log rotation is needed"""
     try:
-        # Check file size
-        file_size_mb = os.path.getsize(log_file) / (1024 * 1024)
-        
-        if file_size_mb >= MAX_LOG_SIZE_MB:
-            # Rotate the file
-            timestamp = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')
-            rotated_file = f"{log_file}.{timestamp}"
-            os.rename(log_file, rotated_file)
-            
-            # Clean up old files if needed
-            log_files = [os.path.join(LOG_DIR, f) for f in os.listdir(LOG_DIR) 
-                         if f.startswith('audit-') and '.log.' in f]
-            
-            # Sort by modification time (oldest first)
-            log_files.sort(key=os.path.getmtime)
-            
-            # Remove oldest files if we have too many
-            while len(log_files) > MAX_LOG_FILES:
-                os.remove(log_files.pop(0))
-    
+        await asyncio.to_thread(_rotate_log_file, log_file)
     except Exception as e:
         logger.error(f"Error rotating audit logs: {str(e)}")
 
+def _rotate_log_file(log_file: str) -> None:
+    """Rotate the log file if it is too large and prune old rotated files"""
+    # Check file size
+    file_size_mb = os.path.getsize(log_file) / (1024 * 1024)
+    
+    if file_size_mb >= MAX_LOG_SIZE_MB:
+        # Rotate the file
+        timestamp = datetime.datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        rotated_file = f"{log_file}.{timestamp}"
+        os.rename(log_file, rotated_file)
+        if os.path.exists(_index_path(log_file)):
+            os.rename(_index_path(log_file), _index_path(rotated_file))
+        
+        # Clean up old files if needed
+        log_files = [os.path.join(LOG_DIR, f) for f in os.listdir(LOG_DIR) 
+                     if f.startswith('audit-') and '.log.' in f]
+        
+        # Sort by modification time (oldest first)
+        log_files.sort(key=os.path.getmtime)
+        
+        # Remove oldest files if we have too many
+        while len(log_files) > MAX_LOG_FILES:
+            oldest = log_files.pop(0)
+            os.remove(oldest)
+            if os.path.exists(_index_path(oldest)):
+                os.remove(_index_path(oldest))
+
+def sanitize_string(value: str) -> str:
+    """
+    Mask sensitive patterns in a string value
+    
+    Patterns are applied in order because earlier ones (e.g. SSN) must win
+    over broader later ones (e.g. phone); the fused scan skips that work for
+    strings that contain nothing sensitive.
+    """
+    if not _FUSED_PATTERN.search(value):
+        return value
+    for pattern, replacement in _COMPILED_PATTERNS:
+        value = pattern.sub(replacement, value)
+    return value
+
 def sanitize_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Sanitize sensitive data
@@ -213,40 +456,27 @@ def sanitize_data(data: Dict[str, Any]) -> Dict[str, Any]:
         data: Data to sanitize
         
     Returns:
-        Sanitized data
+        Sanitized copy of the data (the original is not modified)
     """
-    import re
-    
     if not data:
         return {}
     
-    # Deep copy to avoid modifying original
-    sanitized = json.loads(json.dumps(data))
-    
-    # Recursive function to sanitize objects
-    def sanitize_object(obj):
-        if not obj or not isinstance(obj, dict):
-            return obj
-        
-        for key, value in obj.items():
-            # Check if key is sensitive
-            if re.search(r'password|token|secret|key|ssn|credit|card|address|email|phone|birth|name|gender|race|ethnicity|diagnosis', key, re.I):
-                obj[key] = '[REDACTED]'
-            elif isinstance(value, str):
-                # Apply patterns to string values
-                for pattern, replacement in SENSITIVE_PATTERNS:
-                    value = re.sub(pattern, replacement, value)
-                obj[key] = value
-            elif isinstance(value, dict):
-                # Recurse into nested objects
-                obj[key] = sanitize_object(value)
-            elif isinstance(value, list):
-                # Recurse into list items
-                obj[key] = [sanitize_object(item) if isinstance(item, dict) else item for item in value]
-        
-        return obj
-    
-    return sanitize_object(sanitized)
+    return _sanitize_value(data)
+
+def _sanitize_value(value: Any) -> Any:
+    """Recursively build a sanitized copy of a value"""
+    if isinstance(value, dict):
+        # Keys are stringified (e.g. int ids) as the earlier JSON round-trip did
+        return {
+            str(key): '[REDACTED]' if _is_sensitive_key(str(key)) else _sanitize_value(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple, set, frozenset)):
+        # Other sequences come back as lists, as the earlier JSON round-trip made them
+        return [_sanitize_value(item) for item in value]
+    if isinstance(value, str):
+        return sanitize_string(value)
+    return value
 
 @asynccontextmanager
 async def audit_context(
@@ -270,19 +500,24 @@ async def audit_context(
     """
     start_time = datetime.datetime.utcnow()
     operation_id = str(uuid.uuid4())
+    action_str = _ACT_TO_STR.get(action, action)
+    
+    # The caller's details are the only free-form part of these events, so
+    # sanitize them once here; the bookkeeping fields added below are
+    # generated values with no sensitive keys and are passed through as-is
+    base_details = sanitize_data(details) if sensitive else (details or {})
     
     # Log start event
     await log_event(
         category=category,
-        action=f"{action}_started",
+        action=action_str + "_started",
         user_id=user_id,
         details={
-            **(details or {}),
+            **base_details,
             "operation_id": operation_id,
             "status": "started"
         },
-        ip_address=ip_address,
-        sensitive=sensitive
+        ip_address=ip_address
     )
     
     error = None
@@ -293,16 +528,15 @@ async def audit_context(
         # Log error event
         await log_event(
             category=category,
-            action=f"{action}_failed",
+            action=action_str + "_failed",
             user_id=user_id,
             details={
-                **(details or {}),
+                **base_details,
                 "operation_id": operation_id,
                 "status": "failed",
-                "error": str(e)
+                "error": sanitize_string(str(e)) if sensitive else str(e)
             },
-            ip_address=ip_address,
-            sensitive=sensitive
+            ip_address=ip_address
         )
         raise
     finally:
@@ -313,21 +547,23 @@ async def audit_context(
             # Log completion event
             await log_event(
                 category=category,
-                action=f"{action}_completed",
+                action=action_str + "_completed",
                 user_id=user_id,
                 details={
-                    **(details or {}),
+                    **base_details,
                     "operation_id": operation_id,
                     "status": "completed",
                     "duration_ms": duration_ms
                 },
-                ip_address=ip_address,
-                sensitive=sensitive
+                ip_address=ip_address
             )
 
 async def initialize():
     """Initialize the audit logger"""
+    global _flush_event
+    
     os.makedirs(LOG_DIR, exist_ok=True)
+    _flush_event = asyncio.Event()
     
     # Log startup event
     await log_event(
@@ -336,13 +572,17 @@ async def initialize():
         details={"message": "Audit logging system initialized"}
     )
     
-    # Start background task to periodically flush logs
+    # Start background task to flush logs
     asyncio.create_task(periodic_flush())
 
 async def periodic_flush():
-    """Periodically flush logs"""
+    """Flush logs whenever the buffer fills, and at least every FLUSH_INTERVAL_SECONDS"""
     while True:
-        await asyncio.sleep(30)  # Flush every 30 seconds
+        try:
+            await asyncio.wait_for(_flush_event.wait(), timeout=FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _flush_event.clear()
         await flush_logs()
 
 async def shutdown():
@@ -381,8 +621,6 @@ async def get_audit_logs(
     Returns:
         List of audit logs
     """
-    logs = []
-    
     # Set default dates if not provided
     if not end_date:
         end_date = datetime.datetime.utcnow()
@@ -390,12 +628,34 @@ async def get_audit_logs(
         start_date = end_date - datetime.timedelta(days=7)
     
     # Convert to strings for comparison
-    category_str = category.value if isinstance(category, LOG_CATEGORY) else category
-    action_str = action.value if isinstance(action, LOG_ACTION) else action
+    category_str = _CAT_TO_STR.get(category, category)
+    action_str = _ACT_TO_STR.get(action, action)
+    
+    # Scanning and parsing the files is blocking work, so keep it off the event loop
+    logs = await asyncio.to_thread(
+        _read_audit_logs, start_date, end_date, category_str, action_str, user_id
+    )
+    
+    # Sort by timestamp (newest first)
+    logs.sort(key=lambda x: x["timestamp"], reverse=True)
+    
+    # Apply pagination
+    return logs[offset:offset+limit]
+
+def _read_audit_logs(
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    category_str: Optional[str],
+    action_str: Optional[str],
+    user_id: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Read and filter audit log entries from the log files in a date range"""
+    logs = []
     
     # Get list of log files within date range
     current_date = start_date
     log_files = []
+    dir_entries = os.listdir(LOG_DIR)
     
     while current_date <= end_date:
         date_str = current_date.strftime('%Y-%m-%d')
@@ -406,7 +666,7 @@ async def get_audit_logs(
         
         # Check for rotated files
         rotated_files = [
-            os.path.join(LOG_DIR, f) for f in os.listdir(LOG_DIR)
+            os.path.join(LOG_DIR, f) for f in dir_entries
             if f.startswith(f"audit-{date_str}.log.")
         ]
         log_files.extend(rotated_files)
@@ -416,15 +676,21 @@ async def get_audit_logs(
     # Process each log file
     for log_file in log_files:
         try:
-            with open(log_file, 'r') as f:
-                for line in f:
+            spans = _indexed_spans(log_file, start_date, end_date, category_str, action_str, user_id)
+            with open(log_file, 'rb') as f:
+                if spans is None:
+                    lines = iter(f)
+                else:
+                    lines = (_read_span(f, offset, length) for offset, length in spans)
+                
+                for line in lines:
                     try:
                         log_entry = json.loads(line.strip())
                         
                         # Parse timestamp
                         timestamp = datetime.datetime.fromisoformat(log_entry["timestamp"].rstrip("Z"))
                         
-                        # Apply filters
+                        # Apply filters (the index may have hash collisions, so always re-check)
                         if timestamp < start_date or timestamp > end_date:
                             continue
                         
@@ -443,11 +709,48 @@ async def get_audit_logs(
         except Exception as e:
             logger.error(f"Error reading audit log file {log_file}: {str(e)}")
     
-    # Sort by timestamp (newest first)
-    logs.sort(key=lambda x: x["timestamp"], reverse=True)
+    return logs
+
+def _indexed_spans(
+    log_file: str,
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    category_str: Optional[str],
+    action_str: Optional[str],
+    user_id: Optional[str]
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    Get (offset, length) of candidate lines from the log file's index
     
-    # Apply pagination
-    return logs[offset:offset+limit]
+    Returns None if the file has no usable index and must be scanned in full.
+    """
+    index_file = _index_path(log_file)
+    try:
+        if os.path.getsize(index_file) % _INDEX_DTYPE.itemsize:
+            return None
+        records = np.fromfile(index_file, dtype=_INDEX_DTYPE)
+    except OSError:
+        return None
+    
+    # Only trust an index that accounts for every byte of the log file
+    if int(records['length'].sum()) != os.path.getsize(log_file):
+        return None
+    
+    mask = (records['timestamp'] >= _to_micros(start_date)) & (records['timestamp'] <= _to_micros(end_date))
+    if category_str:
+        mask &= records['category'] == _hash_field(category_str)
+    if action_str:
+        mask &= records['action'] == _hash_field(action_str)
+    if user_id:
+        mask &= records['user'] == _hash_field(user_id)
+    
+    matches = records[mask]
+    return list(zip(matches['offset'].tolist(), matches['length'].tolist()))
+
+def _read_span(f, offset: int, length: int) -> bytes:
+    """Read one line of a log file given its offset and length"""
+    f.seek(offset)
+    return f.read(length)
 
 async def generate_compliance_report(
     start_date: datetime.datetime,
@@ -466,6 +769,11 @@ async def generate_compliance_report(
     # Get all logs within date range
     logs = await get_audit_logs(start_date, end_date, limit=10000)
     
+    # Count events per category, action and user (Counter does the counting in C)
+    category_counts = collections.Counter(log.get("category") for log in logs)
+    action_counts = collections.Counter(log.get("action") for log in logs)
+    user_counts = collections.Counter(log.get("user_id") for log in logs)
+    
     # Initialize report data
     report = {
         "report_id": str(uuid.uuid4()),
@@ -473,47 +781,18 @@ async def generate_compliance_report(
         "period_start": start_date.isoformat(),
         "period_end": end_date.isoformat(),
         "total_events": len(logs),
-        "categories": {},
-        "users": {},
-        "security_incidents": 0,
-        "data_access_events": 0,
-        "anonymization_events": 0,
-        "consent_events": 0
+        "categories": dict(category_counts),
+        "users": dict(user_counts),
+        "security_incidents": category_counts[_CAT_SECURITY],
+        "data_access_events": category_counts[_CAT_DATA_ACCESS],
+        "anonymization_events": action_counts[_ACT_ANONYMIZE],
+        "consent_events": category_counts[_CAT_CONSENT]
     }
     
-    # Process logs
-    for log in logs:
-        category = log.get("category")
-        action = log.get("action")
-        user_id = log.get("user_id")
-        
-        # Update category counts
-        if category not in report["categories"]:
-            report["categories"][category] = 0
-        report["categories"][category] += 1
-        
-        # Update user counts
-        if user_id not in report["users"]:
-            report["users"][user_id] = 0
-        report["users"][user_id] += 1
-        
-        # Count specific event types
-        if category == LOG_CATEGORY.SECURITY.value:
-            report["security_incidents"] += 1
-        
-        if category == LOG_CATEGORY.DATA_ACCESS.value:
-            report["data_access_events"] += 1
-        
-        if action == LOG_ACTION.ANONYMIZE.value:
-            report["anonymization_events"] += 1
-        
-        if category == LOG_CATEGORY.CONSENT.value:
-            report["consent_events"] += 1
-    
     # Add summary
     report["summary"] = {
-        "most_active_user": max(report["users"].items(), key=lambda x: x[1])[0] if report["users"] else None,
-        "most_common_category": max(report["categories"].items(), key=lambda x: x[1])[0] if report["categories"] else None,
+        "most_active_user": max(user_counts, key=user_counts.__getitem__) if user_counts else None,
+        "most_common_category": max(category_counts, key=category_counts.__getitem__) if category_counts else None,
         "security_incident_rate": report["security_incidents"] / report["total_events"] if report["total_events"] > 0 else 0,
         "anonymization_rate": report["anonymization_events"] / report["total_events"] if report["total_events"] > 0 else 0
     }
@@ -2,19 +2,35 @@
 Chatbot utilities for MediScan AI.
 """
 
-import os
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional
 import json
 import re
 import time
 import random
-from datetime import datetime
-import uuid
+import functools
+from datetime import datetime, timedelta
+from collections import deque, OrderedDict
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Number of normalized messages whose matched intent is remembered
+INTENT_CACHE_SIZE = 1024
+
+# History entries store raw nanosecond timestamps; ISO strings are only
+# built when the history is read
+_EPOCH = datetime(1970, 1, 1)
+
+def _format_timestamp(ts_ns: int) -> str:
+    """Format a time.time_ns() value as a UTC ISO-8601 string"""
+    return (_EPOCH + timedelta(microseconds=ts_ns // 1000)).isoformat()
+
+# Messages kept per conversation, and conversations kept before the least
+# recently active one is evicted
+MAX_HISTORY_MESSAGES = 200
+MAX_CONVERSATIONS = 10000
+
 # Define intents and responses
 DEFAULT_INTENTS = {
     "greeting": {
@@ -150,28 +166,108 @@ class Intent:
         self.name = name
         self.patterns = patterns
         self.responses = responses
+        # Normalized once at load so the automaton and responses need no per-call work
+        self._patterns_lower = tuple(pattern.lower() for pattern in patterns)
+        self._responses = tuple(responses)
+        # One case-insensitive alternation, so matching is a single C-level scan
+        self._regex = re.compile(
+            "|".join(map(re.escape, patterns)), re.IGNORECASE
+        ) if patterns else None
     
     def matches(self, text: str) -> bool:
         """Check if the text matches this intent"""
-        text = text.lower()
-        
-        # Check for exact matches in patterns
-        for pattern in self.patterns:
-            if pattern.lower() in text:
-                return True
-        
-        return False
+        return self._regex is not None and self._regex.search(text) is not None
     
     def get_response(self) -> str:
         """Get a random response for this intent"""
-        return random.choice(self.responses)
+        return self._responses[random.randrange(len(self._responses))]
+
+class PatternAutomaton:
+    """
+    Aho-Corasick automaton over the patterns of a list of intents.
+    
+    Finds the first intent (in list order) with a pattern occurring in the
+    text using a single pass over the text, however many patterns exist.
+    """
+    
+    def __init__(self, intents: List[Intent]):
+        # Node 0 is the root; each node has goto transitions, a failure link
+        # and the lowest intent index whose pattern ends at it or its suffixes
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]
+        self._min_length = float('inf')
+        
+        for index, intent in enumerate(intents):
+            if intent.name == "fallback":
+                continue
+            for pattern in intent._patterns_lower:
+                self._add_pattern(pattern, index)
+        
+        self._build_failure_links()
+        # Characters that can start a match, for rejecting texts before the scan
+        self._first_chars = frozenset(self._goto[0])
+    
+    def _add_pattern(self, pattern: str, index: int) -> None:
+        """Insert a lowercased pattern into the trie"""
+        self._min_length = min(self._min_length, len(pattern))
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[node][char] = next_node
+            node = next_node
+        
+        # An empty pattern matches any text, as a substring check would
+        if self._best[node] is None or index < self._best[node]:
+            self._best[node] = index
+    
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and fold suffix matches into each node"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                suffix_best = self._best[self._fail[child]]
+                if suffix_best is not None and (self._best[child] is None or suffix_best < self._best[child]):
+                    self._best[child] = suffix_best
+    
+    def search(self, text: str) -> Optional[int]:
+        """Return the index of the first intent matching the lowercased text, if any"""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = best_at[0]
+        # Cheap C-level rejections: text shorter than every pattern, or with no
+        # character that starts one, cannot match (unless an empty pattern did)
+        if best is None and (len(text) < self._min_length or self._first_chars.isdisjoint(text)):
+            return None
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = best_at[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return best
 
 class ChatBot:
     """Simple rule-based chatbot for MediScan AI"""
     
     def __init__(self):
         self.intents = []
-        self.conversation_history = {}
+        self.conversation_history: "OrderedDict[str, deque]" = OrderedDict()
         self.load_default_intents()
     
     def load_default_intents(self) -> None:
@@ -182,6 +278,7 @@ class ChatBot:
                 patterns=intent_data["patterns"],
                 responses=intent_data["responses"]
             ))
+        self._build_matcher()
     
     def load_intents_from_file(self, file_path: str) -> None:
         """Load intents from a JSON file"""
@@ -189,17 +286,20 @@ class ChatBot:
             with open(file_path, 'r') as f:
                 intents_data = json.load(f)
             
-            # Clear existing intents
-            self.intents = []
-            
-            # Load intents from file
-            for intent_name, intent_data in intents_data.items():
-                self.intents.append(Intent(
+            # Build the full list first, so a bad entry leaves the current
+            # intents and their matcher untouched
+            intents = [
+                Intent(
                     name=intent_name,
                     patterns=intent_data.get("patterns", []),
                     responses=intent_data.get("responses", ["I don't know what to say."])
-                ))
-                
+                )
+                for intent_name, intent_data in intents_data.items()
+            ]
+            
+            self.intents = intents
+            self._build_matcher()
+            
             logger.info(f"Loaded {len(self.intents)} intents from {file_path}")
         except Exception as e:
             logger.error(f"Error loading intents from file: {e}")
@@ -214,21 +314,53 @@ class ChatBot:
         Returns:
             Matching intent or fallback intent
         """
-        # Check all intents for a match
-        for intent in self.intents:
-            if intent.name != "fallback" and intent.matches(text):
-                return intent
+        # Single scan of the text for the first intent with a matching pattern;
+        # repeated messages ("hi", "thanks") are answered from the cache
+        index = self._search_intent(" ".join(text.lower().split()))
+        if index is not None:
+            return self.intents[index]
         
-        # Return fallback intent if no match found
-        for intent in self.intents:
-            if intent.name == "fallback":
-                return intent
+        return self._fallback
+    
+    def classify_batch(self, messages: List[str]) -> List[str]:
+        """
+        Determine the intent names for many messages at once, e.g. for
+        analytics over stored conversation logs
         
-        # If no fallback intent, create one
-        return Intent(
-            name="fallback",
-            patterns=[],
-            responses=["I'm not sure how to respond to that."]
+        Args:
+            messages: User messages
+            
+        Returns:
+            Intent name for each message, in order
+        """
+        search = self._matcher.search
+        fallback_name = self._fallback.name
+        # Logs repeat heavily, so each distinct message is scanned once; a
+        # local dict keeps bulk runs from evicting the live request cache
+        names: Dict[str, str] = {}
+        results = []
+        for text in messages:
+            key = " ".join(text.lower().split())
+            name = names.get(key)
+            if name is None:
+                index = search(key)
+                name = names[key] = fallback_name if index is None else self.intents[index].name
+            results.append(name)
+        return results
+    
+    def _build_matcher(self) -> None:
+        """Rebuild the pattern automaton and fallback intent after intents change"""
+        self._matcher = PatternAutomaton(self.intents)
+        # A fresh cache per automaton, so reloading intents invalidates it
+        self._search_intent = functools.lru_cache(maxsize=INTENT_CACHE_SIZE)(self._matcher.search)
+        self._fallback = next(
+            (intent for intent in self.intents if intent.name == "fallback"),
+            # If no fallback intent, create one
+            Intent(
+                name="fallback",
+                patterns=[],
+                responses=["I'm not sure how to respond to that."]
+            )
         )
     
     def get_response(self, text: str, user_id: str) -> str:
@@ -242,15 +374,22 @@ class ChatBot:
         Returns:
             Chatbot response
         """
-        # Create conversation entry if it doesn't exist
-        if user_id not in self.conversation_history:
-            self.conversation_history[user_id] = []
+        # Create conversation entry if it doesn't exist, and mark it most recently active
+        history = self.conversation_history.get(user_id)
+        if history is None:
+            history = self.conversation_history[user_id] = deque(maxlen=MAX_HISTORY_MESSAGES)
+            if len(self.conversation_history) > MAX_CONVERSATIONS:
+                self.conversation_history.popitem(last=False)
+        else:
+            self.conversation_history.move_to_end(user_id)
+        
+        ts_ns = time.time_ns()
         
         # Add user message to history
-        self.conversation_history[user_id].append({
+        history.append({
             "role": "user",
             "message": text,
-            "timestamp": datetime.utcnow().isoformat()
+            "ts_ns": ts_ns
         })
         
         # Get intent and response
@@ -258,11 +397,11 @@ class ChatBot:
         response = intent.get_response()
         
         # Add bot response to history
-        self.conversation_history[user_id].append({
+        history.append({
             "role": "bot",
             "message": response,
             "intent": intent.name,
-            "timestamp": datetime.utcnow().isoformat()
+            "ts_ns": ts_ns
         })
         
         return response
@@ -277,7 +416,12 @@ class ChatBot:
         Returns:
             List of conversation messages
         """
-        return self.conversation_history.get(user_id, [])
+        history = []
+        for entry in self.conversation_history.get(user_id, ()):
+            message = {key: value for key, value in entry.items() if key != "ts_ns"}
+            message["timestamp"] = _format_timestamp(entry["ts_ns"])
+            history.append(message)
+        return history
     
     def clear_conversation_history(self, user_id: str) -> None:
         """
@@ -287,7 +431,7 @@ class ChatBot:
             user_id: User identifier
         """
         if user_id in self.conversation_history:
-            self.conversation_history[user_id] = []
+            self.conversation_history[user_id].clear()
 
 # Create singleton instance
 chatbot = ChatBot() 
@@ -1,5 +1,7 @@
 import pydicom
+from pydicom.tag import Tag, BaseTag
 import os
+import asyncio
 import logging
 import tempfile
 from typing import Dict, Any, Optional, List, Union
@@ -8,7 +10,24 @@ import io
 # Set up logging
 logger = logging.getLogger(__name__)
 
-async def validate_dicom_file(file_path: str) -> bool:
+# Required attributes for an uploaded file to count as a usable DICOM study
+REQUIRED_DICOM_ATTRIBUTES = ('PatientID', 'StudyDate', 'Modality')
+
+def _read_header(file_path: str, specific_tags: Optional[List[BaseTag]] = None) -> pydicom.dataset.FileDataset:
+    """Read a DICOM file's header, skipping pixel data and deferring large values"""
+    with open(file_path, 'rb') as fp:
+        dicom_data = pydicom.dcmread(
+            fp,
+            force=False,
+            stop_before_pixels=True,
+            defer_size="1 KB",
+            specific_tags=specific_tags
+        )
+        # Reading only stops early at the pixel data, so any bytes left mean it exists
+        dicom_data._has_pixel_data = fp.read(1) != b''
+    return dicom_data
+
+async def validate_dicom_file(file_path: str) -> Optional[pydicom.dataset.FileDataset]:
     """
     Validate if a file is a valid DICOM file
     
@@ -16,62 +35,60 @@ async def validate_dicom_file(file_path: str) -> bool:
         file_path: Path to the file
         
     Returns:
-        True if file is a valid DICOM file, False otherwise
+        The parsed DICOM header if the file is valid, None otherwise. Pass it
+        to extract_dicom_metadata to avoid reading the file again.
     """
+    # Parsing is blocking I/O and CPU work, so keep it off the event loop
+    return await asyncio.to_thread(_validate_dicom_file, file_path)
+
+def _validate_dicom_file(file_path: str) -> Optional[pydicom.dataset.FileDataset]:
+    """Read the header and check the required attributes (runs in a worker thread)"""
     try:
         # Try to read the file as DICOM
-        dicom_data = pydicom.dcmread(file_path, force=False, stop_before_pixels=True)
+        dicom_data = _read_header(file_path)
         
         # Check if file has required DICOM attributes
-        required_attributes = ['PatientID', 'StudyDate', 'Modality']
-        for attr in required_attributes:
-            if not hasattr(dicom_data, attr):
+        for attr in REQUIRED_DICOM_ATTRIBUTES:
+            if attr not in dicom_data:
                 logger.warning(f"DICOM file missing required attribute: {attr}")
-                return False
+                return None
         
-        return True
+        return dicom_data
     
     except Exception as e:
         logger.warning(f"Invalid DICOM file: {str(e)}")
-        return False
+        return None
 
-async def extract_dicom_metadata(file_path: str) -> Dict[str, Any]:
+async def extract_dicom_metadata(
+    source: Union[str, pydicom.dataset.Dataset]
+) -> Dict[str, Any]:
     """
     Extract metadata from a DICOM file
     
     Args:
-        file_path: Path to the DICOM file
+        source: Path to the DICOM file, or a dataset already read by validate_dicom_file
         
     Returns:
         Dictionary containing DICOM metadata
     """
+    # Reading the header, or deferred values of an already-read one, blocks
+    return await asyncio.to_thread(_extract_dicom_metadata, source)
+
+def _extract_dicom_metadata(source: Union[str, pydicom.dataset.Dataset]) -> Dict[str, Any]:
+    """Build the metadata dict from a path or parsed dataset (runs in a worker thread)"""
     try:
-        # Read DICOM file but skip pixel data for performance
-        dicom_data = pydicom.dcmread(file_path, stop_before_pixels=True)
+        # Read only the tags used below, skipping pixel data for performance
+        if isinstance(source, str):
+            dicom_data = _read_header(source, specific_tags=_METADATA_TAG_LIST)
+        else:
+            dicom_data = source
         
-        # Extract key metadata attributes
+        # Extract key metadata attributes in one pass over precomputed tags
         metadata = {
-            'patient_id': safe_get_attribute(dicom_data, 'PatientID'),
-            'patient_name': safe_get_attribute(dicom_data, 'PatientName'),
-            'patient_birth_date': safe_get_attribute(dicom_data, 'PatientBirthDate'),
-            'patient_sex': safe_get_attribute(dicom_data, 'PatientSex'),
-            'study_date': safe_get_attribute(dicom_data, 'StudyDate'),
-            'study_time': safe_get_attribute(dicom_data, 'StudyTime'),
-            'study_description': safe_get_attribute(dicom_data, 'StudyDescription'),
-            'modality': safe_get_attribute(dicom_data, 'Modality'),
-            'manufacturer': safe_get_attribute(dicom_data, 'Manufacturer'),
-            'institution_name': safe_get_attribute(dicom_data, 'InstitutionName'),
-            'body_part_examined': safe_get_attribute(dicom_data, 'BodyPartExamined'),
-            'pixel_spacing': safe_get_attribute(dicom_data, 'PixelSpacing'),
-            'rows': safe_get_attribute(dicom_data, 'Rows'),
-            'columns': safe_get_attribute(dicom_data, 'Columns'),
-            'bits_allocated': safe_get_attribute(dicom_data, 'BitsAllocated'),
-            'image_orientation': safe_get_attribute(dicom_data, 'ImageOrientationPatient'),
-            'image_position': safe_get_attribute(dicom_data, 'ImagePositionPatient'),
-            'window_center': safe_get_attribute(dicom_data, 'WindowCenter'),
-            'window_width': safe_get_attribute(dicom_data, 'WindowWidth'),
-            'has_pixel_data': hasattr(dicom_data, 'PixelData')
+            key: _get_tag_value(dicom_data, tag, convert)
+            for key, tag, convert in _METADATA_TAGS
         }
+        metadata['has_pixel_data'] = getattr(dicom_data, '_has_pixel_data', _PIXEL_DATA_TAG in dicom_data)
         
         return metadata
     
@@ -79,6 +96,49 @@ async def extract_dicom_metadata(file_path: str) -> Dict[str, Any]:
         logger.error(f"Error extracting DICOM metadata: {str(e)}")
         raise
 
+def _convert_value(value: Any) -> Union[str, int, float, None]:
+    """Convert sequences or arrays to strings, leaving scalar values as they are"""
+    if hasattr(value, '__iter__') and not isinstance(value, (str, bytes)):
+        return str(value)
+    return value
+
+def _get_tag_value(dicom_data: pydicom.dataset.Dataset, tag: BaseTag, convert) -> Union[str, int, float, None]:
+    """Look up an element by tag number and convert its value, or None if missing or unreadable"""
+    try:
+        element = dicom_data.get(tag)
+        return None if element is None else convert(element.value)
+    except Exception:
+        return None
+
+# (metadata key, tag, converter) for extract_dicom_metadata, resolved from
+# keywords once so extraction skips pydicom's keyword lookup per field
+_METADATA_TAGS = tuple(
+    (key, Tag(keyword), convert)
+    for key, keyword, convert in (
+        ('patient_id', 'PatientID', _convert_value),
+        ('patient_name', 'PatientName', str),
+        ('patient_birth_date', 'PatientBirthDate', _convert_value),
+        ('patient_sex', 'PatientSex', _convert_value),
+        ('study_date', 'StudyDate', _convert_value),
+        ('study_time', 'StudyTime', _convert_value),
+        ('study_description', 'StudyDescription', _convert_value),
+        ('modality', 'Modality', _convert_value),
+        ('manufacturer', 'Manufacturer', _convert_value),
+        ('institution_name', 'InstitutionName', _convert_value),
+        ('body_part_examined', 'BodyPartExamined', _convert_value),
+        ('pixel_spacing', 'PixelSpacing', _convert_value),
+        ('rows', 'Rows', _convert_value),
+        ('columns', 'Columns', _convert_value),
+        ('bits_allocated', 'BitsAllocated', _convert_value),
+        ('image_orientation', 'ImageOrientationPatient', _convert_value),
+        ('image_position', 'ImagePositionPatient', _convert_value),
+        ('window_center', 'WindowCenter', _convert_value),
+        ('window_width', 'WindowWidth', _convert_value),
+    )
+)
+_METADATA_TAG_LIST = [tag for _, tag, _ in _METADATA_TAGS]
+_PIXEL_DATA_TAG = Tag('PixelData')
+
 def safe_get_attribute(dicom_data: pydicom.dataset.FileDataset, attribute: str) -> Union[str, int, float, None]:
     """
     Safely get an attribute from a DICOM dataset
@@ -107,6 +167,66 @@ def safe_get_attribute(dicom_data: pydicom.dataset.FileDataset, attribute: str)
     except Exception:
         return None
 
+# Tags to anonymize, based on DICOM standard PS3.15 Annex E (Basic Profile).
+# Patient demographics are replaced with placeholder values...
+_ANONYMIZED_VALUES = {
+    Tag('PatientName'): 'ANONYMOUS',
+    Tag('PatientID'): 'ID_REMOVED',
+    Tag('PatientBirthDate'): '19000101',
+    Tag('PatientSex'): 'O',  # Other
+    Tag('PatientAge'): '000Y',
+}
+
+# ...and other identifying elements are removed
+_REMOVED_TAGS = frozenset(Tag(keyword) for keyword in (
+    # Patient identifiers
+    'PatientAddress',
+    'PatientTelephoneNumbers',
+    'OtherPatientIDs',
+    'OtherPatientNames',
+    'OtherPatientIDsSequence',
+    
+    # Physician information
+    'ReferringPhysicianName',
+    'ReferringPhysicianAddress',
+    'ReferringPhysicianTelephoneNumbers',
+    'NameOfPhysiciansReadingStudy',
+    'PhysiciansOfRecord',
+    'PerformingPhysicianName',
+    'RequestingPhysician',
+    
+    # Study information
+    'AccessionNumber',
+    'StudyID',
+    'InstanceCreatorUID',
+    
+    # Institution information
+    'InstitutionName',
+    'InstitutionAddress',
+    'InstitutionalDepartmentName',
+    
+    # Request attributes
+    'RequestAttributesSequence',
+    
+    # Image comments that might contain PHI
+    'ImageComments',
+    'AdditionalPatientHistory',
+))
+
+# Curve data (50xx,3000) and overlay data (60xx,3000) live in repeating
+# groups, so they are matched with the group's low byte masked out
+_REPEATING_GROUP_MASK = 0xFF00FFFF
+_REMOVED_REPEATING_TAGS = frozenset((0x50003000, 0x60003000))
+
+def _anonymize_element(dataset: pydicom.dataset.Dataset, element: pydicom.dataelem.DataElement) -> None:
+    """Dataset.walk callback that replaces or removes an identifying element"""
+    tag = element.tag
+    replacement = _ANONYMIZED_VALUES.get(tag)
+    if replacement is not None:
+        element.value = replacement
+    elif tag in _REMOVED_TAGS or (tag & _REPEATING_GROUP_MASK) in _REMOVED_REPEATING_TAGS:
+        del dataset[tag]
+
 async def anonymize_dicom(file_path: str) -> str:
     """
     Anonymize a DICOM file
@@ -117,85 +237,21 @@ async def anonymize_dicom(file_path: str) -> str:
     Returns:
         Path to the anonymized DICOM file
     """
+    # Reading, rewriting and saving the full file blocks, so run it in a worker thread
+    return await asyncio.to_thread(_anonymize_dicom, file_path)
+
+def _anonymize_dicom(file_path: str) -> str:
+    """Anonymize a DICOM file into a new temporary file (runs in a worker thread)"""
     try:
         # Read the DICOM file
         dicom_data = pydicom.dcmread(file_path)
         
-        # Define tags to anonymize
-        # List of tags based on DICOM standard PS3.15 Annex E (Basic Profile)
-        tags_to_anonymize = [
-            # Patient identifiers
-            'PatientName',
-            'PatientID',
-            'PatientBirthDate',
-            'PatientSex',
-            'PatientAge',
-            'PatientAddress',
-            'PatientTelephoneNumbers',
-            'OtherPatientIDs',
-            'OtherPatientNames',
-            'OtherPatientIDsSequence',
-            
-            # Physician information
-            'ReferringPhysicianName',
-            'ReferringPhysicianAddress',
-            'ReferringPhysicianTelephoneNumbers',
-            'NameOfPhysiciansReadingStudy',
-            'PhysiciansOfRecord',
-            'PerformingPhysicianName',
-            'RequestingPhysician',
-            
-            # Study information
-            'AccessionNumber',
-            'StudyID',
-            'InstanceCreatorUID',
-            
-            # Institution information
-            'InstitutionName',
-            'InstitutionAddress',
-            'InstitutionalDepartmentName',
-            
-            # Request attributes
-            'RequestAttributesSequence',
-            
-            # Image comments that might contain PHI
-            'ImageComments',
-            'AdditionalPatientHistory',
-            
-            # Curve data
-            'CurveData',
-            
-            # Overlay data
-            'OverlayData'
-        ]
-        
-        # Anonymize identified tags
-        for tag in tags_to_anonymize:
-            if hasattr(dicom_data, tag):
-                if tag == 'PatientName':
-                    dicom_data.PatientName = 'ANONYMOUS'
-                elif tag == 'PatientID':
-                    dicom_data.PatientID = 'ID_REMOVED'
-                elif tag == 'PatientBirthDate':
-                    dicom_data.PatientBirthDate = '19000101'
-                elif tag == 'PatientSex':
-                    dicom_data.PatientSex = 'O'  # Other
-                elif tag == 'PatientAge':
-                    dicom_data.PatientAge = '000Y'
-                else:
-                    # Default handling for other tags
-                    try:
-                        delattr(dicom_data, tag)
-                    except:
-                        # If can't delete, try to set to empty value based on VR
-                        try:
-                            setattr(dicom_data, tag, '')
-                        except:
-                            pass
+        # Visit every element once, including those nested in sequences
+        dicom_data.walk(_anonymize_element)
         
-        # Generate a temporary file for the anonymized DICOM
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.dcm') as temp_file:
-            temp_path = temp_file.name
+        # Reserve a temporary path for the anonymized DICOM; save_as writes it directly
+        fd, temp_path = tempfile.mkstemp(suffix='.dcm')
+        os.close(fd)
         
         # Save the anonymized DICOM
         dicom_data.save_as(temp_path)
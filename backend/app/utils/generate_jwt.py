@@ -15,10 +15,14 @@ import base64
 from typing import Dict, Optional
 
 from jose import jwt
-from dotenv import load_dotenv
+
+# Allow running this file directly as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.core.config import load_environment
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Get settings from environment or use defaults
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload, load_only, make_transient_to_detached
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from database import get_db, User, UserRole, MedicalLicense, Specialization, UserSpecialization
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+import asyncio
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -21,6 +20,27 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Built once rather than per decode; every token we issue carries exp and sub
+_JWT_ALGORITHMS = (ALGORITHM,)
+_JWT_DECODE_OPTIONS = {"require_exp": True, "require_sub": True}
+
+# Short-lived cache of users resolved from tokens, so repeated authenticated
+# requests skip the lookup query. Entries are detached snapshots that
+# get_current_user merges into each request's session without SQL.
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_SIZE = 10000
+_user_cache: Dict[str, Tuple[float, User]] = {}
+
+# Token and login lookups only need the user's own columns
+_AUTH_LOAD_OPTIONS = (lazyload(User.specializations),)
+# ...and permission checks only these few; other columns load on first access
+_MINIMAL_LOAD_OPTIONS = _AUTH_LOAD_OPTIONS + (
+    load_only(User.id, User.email, User.is_active, User.role),
+)
+_LOGIN_LOAD_OPTIONS = _AUTH_LOAD_OPTIONS + (
+    load_only(User.id, User.email, User.password),
+)
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -69,6 +89,18 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt is deliberately slow CPU work; async routes use these to run it in a
+# worker thread so the event loop keeps serving other requests meanwhile
+async def averify_password(plain_password, hashed_password):
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password):
+    return await asyncio.to_thread(get_password_hash, password)
+
+# Checked against when the email is unknown, so failed logins cost one bcrypt
+# verification whether or not the account exists
+_DUMMY_HASH = pwd_context.hash("dummy_password_for_timing")
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -79,23 +111,74 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _snapshot_user(user: User) -> User:
+    """Copy a user's column values into a detached instance safe to share between sessions"""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def _cache_user(email: str, user: User) -> None:
+    if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+        # Drop the oldest entry (dicts keep insertion order)
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[email] = (time.monotonic() + USER_CACHE_TTL_SECONDS, _snapshot_user(user))
+
+def invalidate_cached_user(email: str) -> None:
+    """Forget a cached user after changes to their account"""
+    _user_cache.pop(email, None)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _token_email(token: str) -> str:
+    credentials_exception = _credentials_exception()
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.email == token_data.email).first()
+    return token_data.email
+
+def _cached_user(email: str, db: Session) -> Optional[User]:
+    cached = _user_cache.get(email)
+    if cached is not None and cached[0] > time.monotonic():
+        # Attach a per-session copy; commits in this request expire the copy, not the cache
+        return db.merge(cached[1], load=False)
+    return None
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    email = _token_email(token)
+    user = _cached_user(email, db)
+    if user is not None:
+        return user
+    
+    user = db.query(User).options(*_AUTH_LOAD_OPTIONS).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    _cache_user(email, user)
+    return user
+
+async def get_current_user_minimal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """
+    Like get_current_user, for endpoints that only check the user's id, email,
+    active flag or role: a cache miss fetches just those columns
+    """
+    email = _token_email(token)
+    user = _cached_user(email, db)
+    if user is not None:
+        return user
+    
+    # Not cached: a partial row can't be snapshotted without loading the rest
+    user = db.query(User).options(*_MINIMAL_LOAD_OPTIONS).filter(User.email == email).first()
+    if user is None:
+        raise _credentials_exception()
     return user
 
 @router.post("/register", response_model=UserResponse)
@@ -107,7 +190,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await aget_password_hash(user.password)
     db_user = User(
         email=user.email,
         password=hashed_password,
@@ -129,8 +212,9 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/token", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password):
+    user = db.query(User).options(*_LOGIN_LOAD_OPTIONS).filter(User.email == form_data.username).first()
+    password_ok = await averify_password(form_data.password, user.password if user else _DUMMY_HASH)
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -140,6 +224,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     # Update last login
     user.last_login = datetime.utcnow()
     db.commit()
+    invalidate_cached_user(user.email)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -150,7 +235,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 @router.post("/medical-license", response_model=dict)
 async def add_medical_license(
     license_data: MedicalLicenseCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_minimal),
     db: Session = Depends(get_db)
 ):
     if current_user.role not in [UserRole.DOCTOR, UserRole.RADIOLOGIST]:
@@ -173,7 +258,7 @@ async def add_medical_license(
 @router.post("/specialization", response_model=dict)
 async def add_specialization(
     specialization_data: SpecializationCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_minimal),
     db: Session = Depends(get_db)
 ):
     if current_user.role not in [UserRole.DOCTOR, UserRole.RADIOLOGIST]:
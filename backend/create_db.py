@@ -2,11 +2,11 @@ import os
 import sys
 from sqlalchemy import create_engine, text
 from sqlalchemy.exc import ProgrammingError
-from dotenv import load_dotenv
 from urllib.parse import quote_plus
+from app.core.config import load_environment
 
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Get database connection details from environment variables
 DB_USER = os.getenv('DB_USER', 'postgres')
@@ -24,14 +24,19 @@ POSTGRES_URL = f"postgresql://{DB_USER}:{ENCODED_PASSWORD}@{DB_HOST}:{DB_PORT}/p
 def create_database():
     """Create the database if it doesn't exist."""
     try:
-        # Connect to postgres database
-        engine = create_engine(POSTGRES_URL)
+        # Connect to postgres database. CREATE DATABASE cannot run inside a
+        # transaction block, so don't open one implicitly.
+        engine = create_engine(POSTGRES_URL, isolation_level="AUTOCOMMIT")
         with engine.connect() as conn:
             # Check if database exists
-            result = conn.execute(text(f"SELECT 1 FROM pg_database WHERE datname = '{DB_NAME}'"))
+            result = conn.execute(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": DB_NAME}
+            )
             if not result.scalar():
-                # Create database
-                conn.execute(text(f"CREATE DATABASE {DB_NAME}"))
+                # Create database; identifiers can't be bound, so quote the name
+                quoted_name = engine.dialect.identifier_preparer.quote_identifier(DB_NAME)
+                conn.execute(text(f"CREATE DATABASE {quoted_name}"))
                 print(f"Database '{DB_NAME}' created successfully.")
             else:
                 print(f"Database '{DB_NAME}' already exists.")
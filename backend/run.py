@@ -1,17 +1,59 @@
+import os
+import time
+import socket
 import uvicorn
 import logging
+from sqlalchemy.engine import make_url
 from app.core.config import settings
 
+# Worker processes: one in development, the usual 2 * cores + 1 otherwise
+DEFAULT_WORKERS = 1 if settings.ENV == "dev" else 2 * (os.cpu_count() or 1) + 1
+WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", str(DEFAULT_WORKERS))))
+# Each worker sizes its database pool from this, so pass the count on
+os.environ["WEB_CONCURRENCY"] = str(WORKERS)
+
+# How long to wait for the database to accept connections before starting
+DB_WAIT_TIMEOUT = float(os.getenv("DB_WAIT_TIMEOUT", "30"))
+
 logging.basicConfig(
     level=settings.LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+logger = logging.getLogger(__name__)
+
+def wait_for(host: str, port: int, timeout: float = DB_WAIT_TIMEOUT) -> bool:
+    """Poll until host:port accepts TCP connections, backing off from 50ms to 1s"""
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(2 ** attempt * 0.05, 1))
+            attempt += 1
 
 if __name__ == "__main__":
+    # Don't start serving (and initializing the database on startup) until
+    # the database is up, e.g. when it is starting alongside us in Docker
+    db_url = make_url(settings.DATABASE_URL)
+    if db_url.host:
+        db_port = db_url.port or 5432
+        if not wait_for(db_url.host, db_port):
+            logger.warning(f"Database at {db_url.host}:{db_port} not reachable after {DB_WAIT_TIMEOUT}s, starting anyway")
+
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        # Auto-reload only supports a single worker process
+        reload=settings.ENV == "dev" and WORKERS == 1,
+        workers=WORKERS,
+        # uvloop and httptools from uvicorn[standard], falling back to
+        # asyncio and h11 where they aren't installed (uvloop has no Windows build)
+        loop="auto",
+        http="auto",
         log_level=settings.LOG_LEVEL.lower()
-    ) 
\ No newline at end of file
+    )
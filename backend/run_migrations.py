@@ -1,24 +1,37 @@
-import os
 import sys
+import asyncio
+import logging
 from alembic.config import Config
 from alembic import command
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+def upgrade_database(configure_logger: bool = True) -> None:
+    """Upgrade the database schema to the latest revision."""
+    # Get the path to the alembic.ini file
+    alembic_cfg = Config("alembic.ini")
+    # Inside the running application, keep alembic.ini from replacing its logging setup
+    alembic_cfg.attributes["configure_logger"] = configure_logger
+    
+    # Run the migration
+    command.upgrade(alembic_cfg, "head")
+
+async def run_migrations_async() -> None:
+    """Run database migrations in a worker thread without blocking the event loop."""
+    try:
+        await asyncio.to_thread(upgrade_database, False)
+        logger.info("Database migrations completed successfully.")
+    except Exception as e:
+        logger.error(f"Error running migrations: {e}")
 
 def run_migrations():
     """Run database migrations."""
     try:
-        # Get the path to the alembic.ini file
-        alembic_cfg = Config("alembic.ini")
-        
-        # Run the migration
-        command.upgrade(alembic_cfg, "head")
+        upgrade_database()
         print("Database migrations completed successfully.")
     except Exception as e:
         print(f"Error running migrations: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
-    run_migrations() 
\ No newline at end of file
+    run_migrations() 
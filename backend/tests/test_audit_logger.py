@@ -0,0 +1,30 @@
+from backend.app.utils.audit_logger import sanitize_data
+
+def test_sanitize_data_nested_tuple():
+    data = {"recs": ({"name": "John", "note": "ssn 123-45-6789"},)}
+    sanitized = sanitize_data(data)
+    assert isinstance(sanitized["recs"], list)
+    assert sanitized["recs"][0]["name"] == "[REDACTED]"
+    assert "123-45-6789" not in sanitized["recs"][0]["note"]
+
+def test_sanitize_data_int_key():
+    sanitized = sanitize_data({1: {"email": "john@example.com"}, "ok": 2})
+    assert sanitized == {"1": {"email": "[REDACTED]"}, "ok": 2}
+
+def test_serialize_entry_non_json_values():
+    import datetime
+    import json
+    from backend.app.utils.audit_logger import LogEntry, _serialize_entry
+    
+    def entry(details):
+        return LogEntry(
+            id="1", timestamp="2024-01-01T00:00:00", category="system",
+            action="read", user_id=None, ip_address=None, details=details
+        )
+    
+    line = json.loads(_serialize_entry(entry({1: datetime.datetime(2024, 1, 1)})))
+    assert line["details"] == {"1": "2024-01-01T00:00:00"}
+    
+    # Tuple keys aren't representable at all; the entry is still written
+    line = json.loads(_serialize_entry(entry({(1, 2): "x"})))
+    assert line["details"] == repr({(1, 2): "x"})
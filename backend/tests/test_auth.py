@@ -0,0 +1,35 @@
+from passlib.context import CryptContext
+
+from backend.app.models.user import User
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _create_user(db, email="doctor@example.com", password="Correct@123"):
+    user = User(
+        email=email,
+        username="doctor",
+        hashed_password=pwd_context.hash(password),
+        full_name="Test Doctor",
+        is_active=True
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+def test_token_rejects_wrong_password(client, db):
+    _create_user(db)
+    response = client.post(
+        "/token",
+        data={"username": "doctor@example.com", "password": "Wrong@123"}
+    )
+    assert response.status_code == 401
+    assert "access_token" not in response.json()
+
+def test_token_accepts_correct_password(client, db):
+    _create_user(db)
+    response = client.post(
+        "/token",
+        data={"username": "doctor@example.com", "password": "Correct@123"}
+    )
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
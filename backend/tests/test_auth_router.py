@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+# database.py needs DATABASE_URL at import; use a throwaway SQLite file
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import auth
+import database
+from database import SessionLocal, User, UserRole
+
+EMAIL = "login@example.com"
+PASSWORD = "Correct@123"
+
+app = FastAPI()
+app.include_router(auth.router)
+client = TestClient(app)
+
+def _setup_user():
+    database.init_db()
+    with SessionLocal() as session:
+        if session.query(User).filter(User.email == EMAIL).first() is None:
+            session.add(User(
+                email=EMAIL, password=auth.get_password_hash(PASSWORD), name="Login Test",
+                organization="Test", role=UserRole.DOCTOR, phone_number="000"
+            ))
+            session.commit()
+
+def test_login_rejects_wrong_password():
+    _setup_user()
+    response = client.post("/token", data={"username": EMAIL, "password": "Wrong@123"})
+    assert response.status_code == 401
+
+def test_login_rejects_unknown_email():
+    _setup_user()
+    response = client.post("/token", data={"username": "nobody@example.com", "password": PASSWORD})
+    assert response.status_code == 401
+
+def test_login_accepts_correct_password():
+    _setup_user()
+    response = client.post("/token", data={"username": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+
+def test_password_helpers_are_sync():
+    hashed = auth.get_password_hash(PASSWORD)
+    assert auth.verify_password(PASSWORD, hashed) is True
+    assert auth.verify_password("Wrong@123", hashed) is False
@@ -0,0 +1,24 @@
+from backend.app.utils.chatbot import ChatBot, DEFAULT_INTENTS
+
+def _reference_intent(text):
+    """The original matching rule: first intent with a pattern contained in the text"""
+    text = text.lower()
+    for name, data in DEFAULT_INTENTS.items():
+        if name != "fallback" and any(pattern.lower() in text for pattern in data["patterns"]):
+            return name
+    return "fallback"
+
+def test_automaton_matches_substring_rule():
+    bot = ChatBot()
+    messages = ["What is the weather like", "", "xyz"]
+    for data in DEFAULT_INTENTS.values():
+        for pattern in data["patterns"]:
+            messages += [pattern, pattern.upper(), f"so, {pattern} please?", f"Well {pattern}"]
+    
+    for message in messages:
+        assert bot.get_intent(message).name == _reference_intent(message), message
+
+def test_classify_batch_matches_get_intent():
+    bot = ChatBot()
+    messages = ["hello", "Thanks a lot", "upload image", "hello", "nothing relevant"]
+    assert bot.classify_batch(messages) == [bot.get_intent(m).name for m in messages]
@@ -0,0 +1,33 @@
+import os
+import tempfile
+from datetime import datetime
+
+# database.py needs DATABASE_URL at import; use a throwaway SQLite file
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+import database
+from database import MedicalAnalysis, Patient, SessionLocal, count_queries
+
+def test_patient_analyses_load_without_n_plus_one():
+    database.init_db()
+    with SessionLocal() as session:
+        for i in range(3):
+            patient = Patient(
+                mrn=f"MRN-{i}", first_name="Test", last_name=f"Patient{i}",
+                date_of_birth=datetime(1980, 1, 1), gender="F"
+            )
+            patient.analyses = [
+                MedicalAnalysis(analysis_type="CT", status="completed") for _ in range(2)
+            ]
+            session.add(patient)
+        session.commit()
+    
+    with SessionLocal() as session, count_queries() as statements:
+        patients = session.query(Patient).all()
+        total = sum(len(patient.analyses) for patient in patients)
+    
+    assert total == 6
+    # One query for the patients plus one selectin query for all their analyses
+    assert len(statements) == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import pydicom
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+from backend.app.utils.dicom_utils import extract_dicom_metadata, validate_dicom_file
+
+def _write_dicom(path, with_pixels=True):
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = pydicom.uid.CTImageStorage
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    
+    ds = Dataset()
+    ds.file_meta = file_meta
+    ds.SOPClassUID = file_meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+    ds.PatientID = "P-001"
+    ds.PatientName = "Doe^Jane"
+    ds.StudyDate = "20240101"
+    ds.Modality = "CT"
+    if with_pixels:
+        ds.Rows = ds.Columns = 2
+        ds.BitsAllocated = ds.BitsStored = 8
+        ds.HighBit = 7
+        ds.SamplesPerPixel = 1
+        ds.PixelRepresentation = 0
+        ds.PhotometricInterpretation = "MONOCHROME2"
+        ds.PixelData = bytes(4)
+    ds.save_as(str(path), enforce_file_format=True)
+    return path
+
+def test_validate_returns_header_usable_for_metadata(tmp_path):
+    path = str(_write_dicom(tmp_path / "scan.dcm"))
+    
+    header = asyncio.run(validate_dicom_file(path))
+    assert header is not None
+    assert header.PatientID == "P-001"
+    
+    from_header = asyncio.run(extract_dicom_metadata(header))
+    from_path = asyncio.run(extract_dicom_metadata(path))
+    assert from_header == from_path
+    assert from_header["modality"] == "CT"
+    assert from_header["has_pixel_data"] is True
+
+def test_has_pixel_data_false_without_pixels(tmp_path):
+    path = str(_write_dicom(tmp_path / "scan.dcm", with_pixels=False))
+    metadata = asyncio.run(extract_dicom_metadata(asyncio.run(validate_dicom_file(path))))
+    assert metadata["has_pixel_data"] is False
+
+def test_validate_rejects_non_dicom(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("not a dicom file")
+    assert asyncio.run(validate_dicom_file(str(path))) is None
@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import tasks
+
+Base = declarative_base()
+
+class Upload(Base):
+    __tablename__ = "uploads"
+    
+    id = Column(Integer, primary_key=True)
+    status = Column(String)
+
+def test_process_pending_uploads_claims_one_batch(monkeypatch):
+    # SQLite ignores FOR UPDATE SKIP LOCKED, which leaves the claim itself to check
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    
+    db = Session()
+    db.add_all(Upload(status=status) for status in ["pending", "pending", "pending", "completed", "failed"])
+    db.commit()
+    
+    processed = []
+    
+    async def fake_process_upload(upload_id, task_db):
+        # Each task gets its own session, not the one used for the claim
+        assert task_db is not db
+        processed.append(upload_id)
+    
+    monkeypatch.setattr(tasks, "models", SimpleNamespace(Upload=Upload))
+    monkeypatch.setattr(tasks, "process_upload", fake_process_upload)
+    monkeypatch.setattr(tasks, "SessionLocal", Session)
+    monkeypatch.setattr(tasks, "UPLOAD_BATCH_SIZE", 2)
+    
+    asyncio.run(tasks.process_pending_uploads(db))
+    
+    db.expire_all()
+    claimed = [upload.id for upload in db.query(Upload).filter(Upload.status == "processing")]
+    assert len(claimed) == 2
+    assert sorted(processed) == sorted(claimed)
+    # Rows past the batch limit or not pending are left alone
+    remaining = {upload.status for upload in db.query(Upload).filter(Upload.id.notin_(claimed))}
+    assert remaining == {"pending", "completed", "failed"}
+    
+    # The next poll takes what is left and never reclaims a row
+    processed.clear()
+    asyncio.run(tasks.process_pending_uploads(db))
+    assert len(processed) == 1
+    assert processed[0] not in claimed
+    db.close()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import tempfile
+
+# database.py needs DATABASE_URL at import; use a throwaway SQLite file
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+import auth
+import database
+from database import SessionLocal, User, UserRole, count_queries
+
+EMAIL = "cache@example.com"
+
+def _setup_user():
+    database.init_db()
+    auth._user_cache.clear()
+    with SessionLocal() as session:
+        if session.query(User).filter(User.email == EMAIL).first() is None:
+            session.add(User(
+                email=EMAIL, password="x", name="Cache Test", organization="Test",
+                role=UserRole.DOCTOR, phone_number="000"
+            ))
+            session.commit()
+    return auth.create_access_token({"sub": EMAIL})
+
+def _resolve(token):
+    with SessionLocal() as session, count_queries() as statements:
+        user = asyncio.run(auth.get_current_user(token, session))
+        assert user.email == EMAIL
+        return len(statements)
+
+def test_cached_user_skips_query_until_ttl(monkeypatch):
+    token = _setup_user()
+    now = [1000.0]
+    monkeypatch.setattr(auth.time, "monotonic", lambda: now[0])
+    
+    assert _resolve(token) == 1
+    assert _resolve(token) == 0
+    
+    now[0] += auth.USER_CACHE_TTL_SECONDS + 1
+    assert _resolve(token) == 1
+
+def test_invalidate_cached_user_forces_lookup():
+    token = _setup_user()
+    assert _resolve(token) == 1
+    assert _resolve(token) == 0
+    
+    auth.invalidate_cached_user(EMAIL)
+    assert _resolve(token) == 1